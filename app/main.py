@@ -37,7 +37,7 @@ def start():
     s.create_model()
 
 
-@app.get("/prediect/{email}/{groupname")
+@app.get("/prediect/{email}/{groupname}")
 async def prediect(email: str, groupname: str):
     s = Pipe()
     s.get_username_prediction(email, groupname)
\ No newline at end of file
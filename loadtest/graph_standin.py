@@ -0,0 +1,312 @@
+"""Local, seeded stand-in for the Neo4j / GDS server used by the API.
+
+It answers the Cypher queries issued by ``Neo4jRecommendationSystem`` and the
+GDS calls issued by ``Pipe`` from an in-memory graph, so the FastAPI app can be
+load tested without the remote database. ``install()`` swaps the driver classes
+in ``app.Recommandations`` and ``app.Pipeline`` for the ones below.
+"""
+
+import random
+import re
+import threading
+import time
+
+import pandas as pd
+from graphdatascience.model.link_prediction_model import LPModel
+from graphdatascience.pipeline.lp_training_pipeline import LPTrainingPipeline
+
+FIRSTNAME = re.compile(r"firstname:\s*'([^']*)'")
+EMAIL = re.compile(r"email:\s*'([^']*)'")
+
+
+def user_email(index):
+    """Email of the seeded user with the given index."""
+    return f"user{index}@famoba.test"
+
+
+def group_name(index):
+    """Name of the seeded group with the given index."""
+    return f"group{index}"
+
+
+class SeededGraph:
+    """In-memory copy of the Famoba graph generated from a seed."""
+
+    def __init__(self, seed=42, users=1000, groups=50, groups_per_user=3,
+                 query_latency=0.0, train_latency=0.0):
+        rng = random.Random(seed)
+        self.seed = seed
+        self.query_latency = query_latency
+        self.train_latency = train_latency
+
+        self.users = {}
+        self.by_firstname = {}
+        for i in range(users):
+            user = {
+                "id": i,
+                "email": user_email(i),
+                "firstname": f"User{i}",
+                "gender": rng.choice(["female", "male"]),
+                "groups": set(rng.sample(range(groups), min(groups_per_user, groups))),
+            }
+            self.users[user["email"]] = user
+            self.by_firstname[user["firstname"]] = user
+        self.groups = [group_name(i) for i in range(groups)]
+        # The KNN result only depends on the seed, so it is built once here rather than on
+        # every gds.knn.write; otherwise the stand-in's own CPU time is charged to the app.
+        self.similar = self.build_knn()
+
+        # GDS catalog state is server wide, shared by every client instance.
+        self.lock = threading.Lock()
+        self.graphs = set()
+        self.pipelines = {}
+        self.models = {}
+
+    def wait(self, seconds=None):
+        """Simulate the round trip to the database."""
+        seconds = self.query_latency if seconds is None else seconds
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def build_knn(self, top_k=2):
+        """Result of ``gds.knn.write``: link every user to ``top_k`` users of the same gender."""
+        rng = random.Random(self.seed)
+        by_gender = {}
+        for user in self.users.values():
+            by_gender.setdefault(user["gender"], []).append(user["firstname"])
+
+        rows = []
+        for names in by_gender.values():
+            for name in names:
+                others = [other for other in names if other != name]
+                for other in rng.sample(others, min(top_k, len(others))):
+                    rows.append((name, other, round(rng.uniform(0.5, 1.0), 4)))
+        similar = pd.DataFrame(rows, columns=["person1", "person2", "similarity"])
+        return similar.sort_values(["similarity", "person1", "person2"],
+                                   ascending=[False, True, True]).reset_index(drop=True)
+
+    def run(self, query):
+        """Answer one of the Cypher queries issued by the recommendation system."""
+        self.wait()
+        if "SIMILAR" in query:
+            return Cursor(frame=self.similar.copy())
+
+        if "RETURN u.`firstname`" in query:
+            match = EMAIL.search(query)
+            user = self.users.get(match.group(1)) if match else None
+            records = [{"u.`firstname`": user["firstname"]}] if user else []
+            return Cursor(records=records)
+
+        if "Recommended_Group" in query:
+            names = FIRSTNAME.findall(query)
+            user = self.by_firstname.get(names[0]) if names else None
+            similar_user = self.by_firstname.get(names[1]) if len(names) > 1 else None
+            if user is None or similar_user is None:
+                return Cursor(records=[])
+            # Group names stand in for the Groups nodes returned by Neo4j.
+            groups = sorted(similar_user["groups"] - user["groups"])
+            return Cursor(records=[{"Recommended_Group": self.groups[g]} for g in groups])
+
+        raise ValueError(f"Query not supported by the graph stand-in: {query}")
+
+
+class Cursor:
+    """The parts of ``py2neo.Cursor`` used by the app."""
+
+    def __init__(self, records=None, frame=None):
+        self.frame = frame if frame is not None else pd.DataFrame(records or [])
+
+    def __iter__(self):
+        return iter(self.frame.to_dict("records"))
+
+    def to_data_frame(self):
+        return self.frame
+
+    def to_series(self, dtype=None):
+        if self.frame.empty:
+            return pd.Series([], dtype=dtype)
+        return self.frame.iloc[:, 0].astype(dtype) if dtype else self.frame.iloc[:, 0]
+
+
+class ProjectedGraph:
+    """Handle returned by ``gds.graph.project``."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+
+class StandinModel(LPModel):
+    """Trained link prediction model living in the stand-in catalog."""
+
+    def __init__(self, name, graph):
+        super().__init__(name, None, None)
+        self._graph = graph
+
+    def predict_stream(self, G, topN=10, **config):
+        self._graph.wait()
+        rng = random.Random(self._graph.seed)
+        users = list(self._graph.users.values())
+        rows = []
+        for _ in range(min(topN, len(users) * len(self._graph.groups))):
+            rows.append({"node1": rng.choice(users)["id"],
+                         "node2": len(users) + rng.randrange(len(self._graph.groups)),
+                         "probability": round(rng.random(), 4)})
+        return pd.DataFrame(rows)
+
+
+class StandinPipeline(LPTrainingPipeline):
+    """Link prediction pipeline living in the stand-in catalog."""
+
+    def __init__(self, name, graph):
+        super().__init__(name, None, None)
+        self._graph = graph
+        self.steps = []
+
+    def _step(self, kind, **config):
+        self._graph.wait()
+        self.steps.append((kind, config))
+        return pd.Series({"name": self.name(), "step": kind})
+
+    def addNodeProperty(self, procedure_name, **config):
+        return self._step(procedure_name, **config)
+
+    def addFeature(self, feature_type, **config):
+        return self._step(feature_type, **config)
+
+    def configureSplit(self, **config):
+        return self._step("split", **config)
+
+    def addLogisticRegression(self, **config):
+        return self._step("logisticRegression", **config)
+
+    def train(self, G, **config):
+        self._graph.wait(self._graph.train_latency)
+        model = StandinModel(config["modelName"], self._graph)
+        with self._graph.lock:
+            self._graph.models[model.name()] = model
+        return model, pd.Series({"modelInfo": {"modelName": model.name()}})
+
+
+class Namespace:
+    """Attribute holder used to build the ``gds.*`` call tree."""
+
+    def __init__(self, **members):
+        self.__dict__.update(members)
+
+
+class GraphDataScience:
+    """The parts of ``graphdatascience.GraphDataScience`` used by the app."""
+
+    def __init__(self, graph, uri=None, auth=None):
+        self._graph = graph
+        self.graph = Namespace(exists=self._graph_exists, drop=self._graph_drop,
+                               project=self._graph_project)
+        self.pipeline = Namespace(exists=self._pipeline_exists, get=self._pipeline_get,
+                                  drop=self._pipeline_drop)
+        self.beta = Namespace(pipeline=Namespace(linkPrediction=Namespace(create=self._pipeline_create)))
+        self.model = Namespace(exists=self._model_exists, drop=self._model_drop,
+                               list=self._model_list)
+        self.fastRP = Namespace(mutate=self._fast_rp_mutate)
+        self.knn = Namespace(write=self._knn_write)
+
+    def _graph_exists(self, graph_name):
+        self._graph.wait()
+        return pd.Series({"graphName": graph_name, "exists": graph_name in self._graph.graphs})
+
+    def _graph_drop(self, graph_name):
+        self._graph.wait()
+        with self._graph.lock:
+            self._graph.graphs.discard(graph_name)
+        return pd.Series({"graphName": graph_name})
+
+    def _graph_project(self, graph_name, node_projection, relationship_projection):
+        self._graph.wait()
+        with self._graph.lock:
+            if graph_name in self._graph.graphs:
+                raise ValueError(f"A graph with name '{graph_name}' already exists.")
+            self._graph.graphs.add(graph_name)
+        return ProjectedGraph(graph_name), pd.Series({"graphName": graph_name,
+                                                      "nodeCount": len(self._graph.users)})
+
+    def _pipeline_exists(self, pipeline_name):
+        self._graph.wait()
+        return pd.Series({"pipelineName": pipeline_name, "pipelineType": "Link prediction training pipeline",
+                          "exists": pipeline_name in self._graph.pipelines})
+
+    def _pipeline_get(self, pipeline_name):
+        self._graph.wait()
+        return self._graph.pipelines[pipeline_name]
+
+    def _pipeline_drop(self, pipeline):
+        self._graph.wait()
+        with self._graph.lock:
+            self._graph.pipelines.pop(pipeline.name(), None)
+        return pd.Series({"pipelineName": pipeline.name()})
+
+    def _pipeline_create(self, name):
+        self._graph.wait()
+        pipe = StandinPipeline(name, self._graph)
+        with self._graph.lock:
+            if name in self._graph.pipelines:
+                raise ValueError(f"A pipeline with name '{name}' already exists.")
+            self._graph.pipelines[name] = pipe
+        return pipe, pd.Series({"name": name})
+
+    def _model_exists(self, model_name):
+        self._graph.wait()
+        return pd.Series({"modelName": model_name, "modelType": "LinkPrediction",
+                          "exists": model_name in self._graph.models})
+
+    def _model_drop(self, model):
+        self._graph.wait()
+        with self._graph.lock:
+            self._graph.models.pop(model.name(), None)
+        return pd.Series({"modelName": model.name()})
+
+    def _model_list(self):
+        self._graph.wait()
+        return pd.DataFrame([{"modelName": name} for name in self._graph.models])
+
+    def _fast_rp_mutate(self, G, **config):
+        self._graph.wait()
+        return pd.Series({"nodePropertiesWritten": len(self._graph.users)})
+
+    def _knn_write(self, G, **config):
+        self._graph.wait()
+        return pd.Series({"relationshipsWritten": len(self._graph.similar)})
+
+    def close(self):
+        pass
+
+
+class Driver:
+    """The parts of ``neo4j.Driver`` used by the app."""
+
+    def close(self):
+        pass
+
+
+def install(graph):
+    """Point the app's Neo4j and GDS clients at ``graph``."""
+    import app.Pipeline
+    import app.Recommandations
+
+    class Graph:
+        def __init__(self, uri=None, auth=None):
+            self.run = graph.run
+
+    class GraphDatabase:
+        @staticmethod
+        def driver(uri, auth=None):
+            return Driver()
+
+    def gds_factory(uri=None, auth=None):
+        return GraphDataScience(graph, uri, auth)
+
+    app.Recommandations.Graph = Graph
+    app.Recommandations.GraphDataScience = gds_factory
+    app.Pipeline.GraphDatabase = GraphDatabase
+    app.Pipeline.GraphDataScience = gds_factory
@@ -0,0 +1,460 @@
+"""HTTP load test for the FastAPI service.
+
+Starts loadtest.server (app/main.py on the seeded graph stand-in), drives
+/recommandation, /prediect and /start with a configurable number of workers,
+request mix and email distribution, and reports throughput, latency
+percentiles, error rate and server memory over time. Every run is saved as
+JSON under loadtest/results so it can be compared with a previous one.
+
+Usage: python -m loadtest.run --concurrency 8 --duration 30 \
+           --mix recommandation=80,prediect=15,start=5 --distribution hot
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import requests
+
+from loadtest.graph_standin import group_name, user_email
+
+logging.basicConfig(level=logging.INFO)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "loadtest", "results")
+ENDPOINTS = ["recommandation", "prediect", "start"]
+
+
+def parse_mix(text):
+    """Parse ``recommandation=80,prediect=15,start=5`` into endpoint weights."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}', expected one of {ENDPOINTS}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for '{name}': '{weight}'")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("The request mix needs at least one positive weight")
+    return mix
+
+
+def positive(kind):
+    """argparse type accepting only numbers above zero."""
+    def parse(text):
+        try:
+            value = kind(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid value: '{text}'")
+        if value <= 0:
+            raise argparse.ArgumentTypeError(f"Must be greater than 0: '{text}'")
+        return value
+    return parse
+
+
+def fraction(text):
+    """argparse type accepting numbers between 0 and 1."""
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid value: '{text}'")
+    if not 0 <= value <= 1:
+        raise argparse.ArgumentTypeError(f"Must be between 0 and 1: '{text}'")
+    return value
+
+
+class EmailPicker:
+    """Pick user emails following a hot, long-tail or uniform distribution."""
+
+    def __init__(self, users, distribution="hot", hot_users=10, hot_share=0.9, zipf=1.1):
+        self.users = users
+        self.distribution = distribution
+        self.hot_users = max(1, min(hot_users, users))
+        self.hot_share = hot_share
+        if distribution == "longtail":
+            self.cum_weights = list(itertools.accumulate(1 / (rank ** zipf) for rank in range(1, users + 1)))
+
+    def pick(self, rng):
+        if self.distribution == "hot":
+            if rng.random() < self.hot_share:
+                return user_email(rng.randrange(self.hot_users))
+            return user_email(rng.randrange(self.users))
+        if self.distribution == "longtail":
+            return user_email(rng.choices(range(self.users), cum_weights=self.cum_weights)[0])
+        return user_email(rng.randrange(self.users))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = min(max(1, math.ceil(pct / 100 * len(values))), len(values))
+    return values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    """Reduce ``(endpoint, latency, error)`` samples to throughput, latency and error figures."""
+    latencies = sorted(latency for _, latency, _ in samples)
+    error_kinds = {}
+    for _, _, error in samples:
+        if error:
+            error_kinds[error] = error_kinds.get(error, 0) + 1
+    errors = sum(error_kinds.values())
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_kinds": error_kinds,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else None,
+            "p50": _ms(percentile(latencies, 50)),
+            "p95": _ms(percentile(latencies, 95)),
+            "p99": _ms(percentile(latencies, 99)),
+            "max": _ms(latencies[-1] if latencies else None),
+        },
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else seconds * 1000
+
+
+def rss_bytes(pid):
+    """Resident set size of ``pid``, read from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+class MemorySampler(threading.Thread):
+    """Record the server's resident memory at a fixed interval."""
+
+    def __init__(self, pid, interval):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.started_at = time.monotonic()
+
+    def run(self):
+        while True:
+            rss = rss_bytes(self.pid)
+            if rss is not None:
+                self.samples.append({"t": round(time.monotonic() - self.started_at, 3), "rss_bytes": rss})
+            if self.stopped.wait(self.interval):
+                break
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class LoadTest:
+    """Drive the API with ``concurrency`` workers until the duration or request budget is spent."""
+
+    def __init__(self, base_url, args):
+        self.base_url = base_url.rstrip("/")
+        self.args = args
+        self.endpoints = [name for name, weight in args.mix.items() if weight > 0]
+        self.weights = [args.mix[name] for name in self.endpoints]
+        self.emails = EmailPicker(args.users, args.distribution, args.hot_users, args.hot_share, args.zipf)
+        self.samples = []
+        self.failures = []
+        self.lock = threading.Lock()
+        self.issued = 0
+
+    def path(self, endpoint, rng):
+        if endpoint == "recommandation":
+            return f"/recommandation/{quote(self.emails.pick(rng))}"
+        if endpoint == "prediect":
+            return f"/prediect/{quote(self.emails.pick(rng))}/{group_name(rng.randrange(self.args.groups))}"
+        return "/start"
+
+    def take_ticket(self, budget):
+        with self.lock:
+            if budget is not None and self.issued >= budget:
+                return False
+            self.issued += 1
+            return True
+
+    def worker(self, index, budget, deadline, record):
+        rng = random.Random(self.args.seed * 1000 + index)
+        session = requests.Session()
+        while (deadline is None or time.monotonic() < deadline) and self.take_ticket(budget):
+            endpoint = rng.choices(self.endpoints, weights=self.weights)[0]
+            start = time.perf_counter()
+            reconnect = False
+            try:
+                response = session.get(self.base_url + self.path(endpoint, rng), timeout=self.args.timeout)
+                if response.status_code >= 400:
+                    error = f"HTTP {response.status_code}"
+                    reconnect = response.status_code >= 500
+                elif int(response.headers.get("x-loadtest-logged-errors", 0)):
+                    error = "logged error"
+                else:
+                    error = None
+            except requests.RequestException as e:
+                error = type(e).__name__
+                reconnect = True
+            except Exception as e:
+                # A bug in the harness or an unexpected answer, not a slow or failing server.
+                self.fail(e)
+                continue
+            latency = time.perf_counter() - start
+            if record:
+                with self.lock:
+                    self.samples.append((endpoint, latency, error))
+            if reconnect:
+                # uvicorn drops the keep-alive connection after an unhandled exception without
+                # announcing it; reconnect so the next request is not charged for it.
+                session.close()
+                session = requests.Session()
+        session.close()
+
+    def fail(self, error):
+        with self.lock:
+            if not self.failures:
+                logging.exception(f"Load test request failed unexpectedly: {error!r}")
+            self.failures.append(error)
+
+    def guarded_worker(self, *args):
+        try:
+            self.worker(*args)
+        except Exception as e:
+            self.fail(e)
+
+    def phase(self, budget=None, duration=None, record=True):
+        deadline = time.monotonic() + duration if duration is not None else None
+        self.issued = 0
+        workers = [threading.Thread(target=self.guarded_worker, args=(i, budget, deadline, record))
+                   for i in range(self.args.concurrency)]
+        start = time.monotonic()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.monotonic() - start
+
+    def run(self):
+        if self.args.warmup:
+            logging.info(f"Warming up with {self.args.warmup} requests...")
+            self.phase(budget=self.args.warmup, record=False)
+        logging.info(f"Running load test with {self.args.concurrency} workers...")
+        elapsed = self.phase(budget=self.args.requests,
+                             duration=None if self.args.requests else self.args.duration)
+        if self.failures:
+            kinds = sorted({type(error).__name__ for error in self.failures})
+            raise RuntimeError(f"{len(self.failures)} requests failed unexpectedly ({', '.join(kinds)}); "
+                               f"the run is not saved")
+        if not self.samples:
+            raise RuntimeError("No request completed; the run is not saved")
+        report = {"overall": summarize(self.samples, elapsed), "endpoints": {}}
+        for endpoint in self.endpoints:
+            samples = [sample for sample in self.samples if sample[0] == endpoint]
+            report["endpoints"][endpoint] = summarize(samples, elapsed)
+        report["elapsed_s"] = elapsed
+        return report
+
+
+def start_server(args, log):
+    """Launch loadtest.server in a subprocess, logging to ``log``, and wait until it answers on /."""
+    with socket.socket() as probe:
+        # Same option as uvicorn, so sockets of a previous run in TIME_WAIT do not count as busy.
+        probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            probe.bind((args.host, args.port))
+        except OSError as e:
+            raise RuntimeError(f"Cannot start the server on {args.host}:{args.port}: {e}")
+
+    command = [sys.executable, "-m", "loadtest.server", "--host", args.host, "--port", str(args.port),
+               "--seed", str(args.seed), "--users", str(args.users), "--groups", str(args.groups),
+               "--query-latency", str(args.query_latency), "--train-latency", str(args.train_latency)]
+    server = subprocess.Popen(command, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://{args.host}:{args.port}"
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited during startup with code {server.returncode}, see {log.name}")
+        try:
+            response = requests.get(base_url + "/", timeout=1)
+            # Only loadtest.server sets the logged errors header; anything else answering is
+            # another process that grabbed the port after the check above.
+            if response.ok and "x-loadtest-logged-errors" in response.headers and server.poll() is None:
+                return server, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError(f"Server did not answer on {base_url} within {args.startup_timeout}s")
+
+
+def stop_server(server):
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result):
+    def row(name, stats):
+        latency = stats["latency_ms"]
+        cells = [latency[key] for key in ("p50", "p95", "p99")]
+        cells = " ".join(f"{value:9.1f}" if value is not None else f"{'-':>9}" for value in cells)
+        print(f"{name:<16}{stats['requests']:>9}{stats['throughput_rps']:>10.1f}"
+              f"{stats['error_rate'] * 100:>8.1f}% {cells}")
+
+    print(f"\n{'endpoint':<16}{'requests':>9}{'req/s':>10}{'errors':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, stats in result["endpoints"].items():
+        row(endpoint, stats)
+    row("overall", result["overall"])
+    for endpoint, stats in result["endpoints"].items():
+        if stats["error_kinds"]:
+            kinds = ", ".join(f"{kind}: {count}" for kind, count in sorted(stats["error_kinds"].items()))
+            print(f"  {endpoint} errors: {kinds}")
+
+    memory = result["memory"]
+    if memory:
+        rss = [sample["rss_bytes"] for sample in memory]
+        print(f"\nserver RSS: start {rss[0] / 2**20:.1f} MiB, peak {max(rss) / 2**20:.1f} MiB, "
+              f"end {rss[-1] / 2**20:.1f} MiB ({len(rss)} samples)")
+
+
+def compare(result, baseline):
+    """Print how ``result`` moved relative to a previously saved run."""
+    print(f"\nCompared with {baseline.get('revision')} ({baseline.get('timestamp')}):")
+    config, previous_config = result["config"], baseline.get("config", {})
+    differences = [key for key in sorted(set(config) | set(previous_config))
+                   if key not in ("host", "port", "startup_timeout")
+                   and config.get(key) != previous_config.get(key)]
+    if differences:
+        print("  WARNING: the runs used different settings, the deltas are not comparable:")
+        for key in differences:
+            print(f"    {key}: {previous_config.get(key)} -> {config.get(key)}")
+    for name in ["overall"] + list(result["endpoints"]):
+        current = result["overall"] if name == "overall" else result["endpoints"][name]
+        previous = baseline["overall"] if name == "overall" else baseline["endpoints"].get(name)
+        if not previous:
+            continue
+        changes = []
+        for key in ("p50", "p95", "p99"):
+            now, before = current["latency_ms"][key], previous["latency_ms"][key]
+            if now is not None and before:
+                changes.append(f"{key} {(now - before) / before * 100:+.1f}%")
+        if previous["throughput_rps"]:
+            change = (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"]
+            changes.append(f"req/s {change * 100:+.1f}%")
+        changes.append(f"errors {(current['error_rate'] - previous['error_rate']) * 100:+.1f}pt")
+        print(f"  {name:<16}" + ", ".join(changes))
+
+    if result["memory"] and baseline.get("memory"):
+        now = max(sample["rss_bytes"] for sample in result["memory"])
+        before = max(sample["rss_bytes"] for sample in baseline["memory"])
+        print(f"  {'peak RSS':<16}{(now - before) / 2**20:+.1f} MiB")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the FastAPI service against the seeded graph stand-in.")
+    parser.add_argument("--url", help="test an already running server instead of starting loadtest.server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=positive(int), default=4, help="number of concurrent workers")
+    parser.add_argument("--duration", type=positive(float), default=30, help="seconds to run when --requests is not set")
+    parser.add_argument("--requests", type=positive(int), help="total number of requests to send")
+    parser.add_argument("--warmup", type=int, default=0, help="requests sent before measuring")
+    parser.add_argument("--timeout", type=positive(float), default=30, help="per request timeout in seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("recommandation=80,prediect=15,start=5"),
+                        help="endpoint weights, e.g. recommandation=80,prediect=15,start=5")
+    parser.add_argument("--distribution", choices=["hot", "longtail", "uniform"], default="hot",
+                        help="how user emails are picked")
+    parser.add_argument("--hot-users", type=positive(int), default=10, help="size of the hot set for --distribution hot")
+    parser.add_argument("--hot-share", type=fraction, default=0.9, help="share of requests hitting the hot set")
+    parser.add_argument("--zipf", type=float, default=1.1, help="exponent for --distribution longtail")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the graph and the request stream")
+    parser.add_argument("--users", type=positive(int), default=1000, help="number of seeded users")
+    parser.add_argument("--groups", type=positive(int), default=50, help="number of seeded groups")
+    parser.add_argument("--query-latency", type=float, default=0.0,
+                        help="seconds added to every Cypher/GDS call in the stand-in")
+    parser.add_argument("--train-latency", type=float, default=0.0,
+                        help="seconds added to every pipeline training in the stand-in")
+    parser.add_argument("--memory-interval", type=positive(float), default=0.5, help="seconds between RSS samples")
+    parser.add_argument("--startup-timeout", type=float, default=30)
+    parser.add_argument("--output", help="where to save the JSON result (default: loadtest/results/)")
+    parser.add_argument("--compare", help="previous JSON result to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    timestamp = datetime.now(timezone.utc)
+    revision = git_revision()
+    output = args.output or os.path.join(RESULTS_DIR, f"{timestamp:%Y%m%d-%H%M%S}-{revision or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    server, sampler, log = None, None, None
+    try:
+        if args.url:
+            base_url = args.url
+        else:
+            log = open(os.path.splitext(output)[0] + ".log", "w")
+            server, base_url = start_server(args, log)
+            sampler = MemorySampler(server.pid, args.memory_interval)
+            sampler.start()
+        report = LoadTest(base_url, args).run()
+    finally:
+        if sampler:
+            sampler.stop()
+        if server:
+            stop_server(server)
+        if log:
+            log.close()
+
+    result = {
+        "timestamp": timestamp.isoformat(timespec="seconds"),
+        "revision": revision,
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        **report,
+        "memory": sampler.samples if sampler else [],
+    }
+    with open(output, "w") as file:
+        json.dump(result, file, indent=2)
+
+    print_report(result)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(result, json.load(file))
+    print(f"\nResults saved to {output}" + (f", server log in {log.name}" if log else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Start the FastAPI app from app/main.py against the seeded graph stand-in.
+
+Usage: python -m loadtest.server --port 8000 --users 1000 --query-latency 0.005
+"""
+
+import argparse
+import contextvars
+import logging
+import sys
+
+import uvicorn
+
+from loadtest.graph_standin import SeededGraph, install
+
+logging.basicConfig(level=logging.INFO)
+
+ERRORS_HEADER = b"x-loadtest-logged-errors"
+# Errors logged by the request being served; Pipe logs them, Neo4jRecommendationSystem prints them.
+request_errors = contextvars.ContextVar("request_errors", default=None)
+
+
+def count_error():
+    errors = request_errors.get()
+    if errors is not None:
+        errors[0] += 1
+
+
+class ErrorLogHandler(logging.Handler):
+    """Count ERROR records logged while a request is served."""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+
+    def emit(self, record):
+        count_error()
+
+
+class ErrorPrintCounter:
+    """Wrap stdout to count the "An error occurred ..." lines printed while a request is served."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        if text.startswith("An error occurred"):
+            count_error()
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class LoggedErrorsMiddleware:
+    """Report the errors logged by each request in the ``x-loadtest-logged-errors`` header.
+
+    The app catches most failures, logs them and still answers 200, so the status code
+    alone does not show them to the load test.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        errors = [0]
+        request_errors.set(errors)
+
+        async def send_with_errors(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((ERRORS_HEADER, str(errors[0]).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_errors)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve app.main:app backed by the seeded graph stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=42, help="seed for the generated graph")
+    parser.add_argument("--users", type=int, default=1000, help="number of seeded users")
+    parser.add_argument("--groups", type=int, default=50, help="number of seeded groups")
+    parser.add_argument("--query-latency", type=float, default=0.0,
+                        help="seconds added to every Cypher/GDS call")
+    parser.add_argument("--train-latency", type=float, default=0.0,
+                        help="seconds added to every pipeline training")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    graph = SeededGraph(seed=args.seed, users=args.users, groups=args.groups,
+                        query_latency=args.query_latency, train_latency=args.train_latency)
+    install(graph)
+    logging.info(f"Graph stand-in seeded with {args.users} users and {args.groups} groups (seed {args.seed}).")
+
+    logging.getLogger().addHandler(ErrorLogHandler())
+    sys.stdout = ErrorPrintCounter(sys.stdout)
+
+    from app.main import app
+    uvicorn.run(LoggedErrorsMiddleware(app), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+import logging
+import random
+import sys
+
+import pytest
+from starlette.testclient import TestClient
+
+import app.Pipeline
+import app.Recommandations
+from loadtest.graph_standin import SeededGraph, install, user_email
+from loadtest.run import EmailPicker, fraction, parse_mix, percentile, positive
+from loadtest.server import ERRORS_HEADER, ErrorLogHandler, ErrorPrintCounter, LoggedErrorsMiddleware
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """Install a small stand-in graph and restore the real drivers afterwards."""
+    for module, name in [(app.Recommandations, "Graph"), (app.Recommandations, "GraphDataScience"),
+                         (app.Pipeline, "GraphDatabase"), (app.Pipeline, "GraphDataScience")]:
+        monkeypatch.setattr(module, name, getattr(module, name))
+    graph = SeededGraph(users=20, groups=5)
+    install(graph)
+    return graph
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile(list(range(1, 21)), 95) == 19
+    assert percentile([7], 99) == 7
+    assert percentile([3, 4], 0) == 3
+    assert percentile([], 50) is None
+
+
+def test_parse_mix():
+    assert parse_mix("recommandation=80, prediect=15,start=0") == {
+        "recommandation": 80.0, "prediect": 15.0, "start": 0.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("unknown=1")
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("start=abc")
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("start=0")
+
+
+def test_positive_rejects_zero_and_negative():
+    assert positive(float)("2.5") == 2.5
+    for text in ("0", "-1", "x"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            positive(int)(text)
+
+
+def test_fraction_stays_between_zero_and_one():
+    assert fraction("0") == 0.0
+    assert fraction("1") == 1.0
+    for text in ("-0.1", "1.5", "x"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            fraction(text)
+
+
+def test_email_picker_hot_set():
+    picker = EmailPicker(1000, "hot", hot_users=5, hot_share=1.0)
+    rng = random.Random(1)
+    hot = {user_email(i) for i in range(5)}
+    assert {picker.pick(rng) for _ in range(200)} <= hot
+
+
+def test_email_picker_longtail_favours_first_users():
+    picker = EmailPicker(1000, "longtail", zipf=1.1)
+    rng = random.Random(1)
+    picks = [picker.pick(rng) for _ in range(2000)]
+    assert picks.count(user_email(0)) > picks.count(user_email(500))
+    assert set(picks) <= {user_email(i) for i in range(1000)}
+
+
+def test_email_picker_uniform_stays_in_range():
+    picker = EmailPicker(3, "uniform")
+    rng = random.Random(1)
+    assert {picker.pick(rng) for _ in range(100)} == {user_email(i) for i in range(3)}
+
+
+def test_standin_answers_the_recommendation_queries(standin):
+    system = app.Recommandations.Neo4jRecommendationSystem("bolt://standin", "neo4j", "secret")
+    system.establish_connection()
+    recommendation = system.get_recommendation(user_email(0))
+    assert recommendation
+    assert recommendation <= set(standin.groups)
+
+
+def test_logged_errors_header(standin, monkeypatch):
+    from app.main import app as api
+
+    handler = ErrorLogHandler()
+    logging.getLogger().addHandler(handler)
+    monkeypatch.setattr(sys, "stdout", ErrorPrintCounter(sys.stdout))
+    header = ERRORS_HEADER.decode()
+    try:
+        client = TestClient(LoggedErrorsMiddleware(api))
+        assert client.get("/").headers[header] == "0"
+        assert client.get(f"/recommandation/{user_email(0)}").headers[header] == "0"
+        # Neo4jRecommendationSystem prints its errors, here for an unknown email.
+        assert int(client.get("/recommandation/nobody@famoba.test").headers[header]) > 0
+        # Pipe logs them: the second /start fails dropping the model trained by the first.
+        assert client.get("/start").headers[header] == "0"
+        assert int(client.get("/start").headers[header]) > 0
+    finally:
+        logging.getLogger().removeHandler(handler)